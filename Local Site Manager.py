@@ -1,44 +1,94 @@
-import sys, subprocess, importlib
+import sys, os, subprocess
 
-# --- Auto-install required packages ---
-required = ["PyQt5", "flask", "waitress"]
-for pkg in required:
-    try:
-        importlib.import_module(pkg)
-    except ImportError:
-        subprocess.run([sys.executable, "-m", "pip", "install", "--upgrade", pkg], check=True)
+# --- Install required packages (only with --bootstrap or SITE_MGR_BOOTSTRAP=1) ---
+if "--bootstrap" in sys.argv or os.environ.get("SITE_MGR_BOOTSTRAP") == "1":
+    import importlib
+    required = ["PyQt5", "flask", "waitress"]
+    for pkg in required:
+        try:
+            importlib.import_module(pkg)
+        except ImportError:
+            subprocess.run([sys.executable, "-m", "pip", "install", "--upgrade", pkg], check=True)
 
-# Now safely import after ensuring packages exist
-import os, json, shutil, zipfile, socket, webbrowser, time
+import json, shutil, zipfile, socket, selectors, webbrowser, time, struct, queue, threading, errno
 from pathlib import Path
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
-    QLineEdit, QLabel, QListWidget, QTextEdit, QProgressBar, QMessageBox,
-    QTabWidget, QListWidgetItem
+    QLineEdit, QLabel, QListView, QTextEdit, QProgressBar, QMessageBox,
+    QTabWidget
 )
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer
+from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer, QAbstractListModel, QModelIndex
+from PyQt5.QtGui import QBrush
+
+# Optional libdeflate bindings for faster archive/restore; zipfile is the fallback
+try:
+    import deflate
+except ImportError:
+    deflate = None
 
+# Optional orjson for faster metadata (de)serialization; json is the fallback
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 BASE_DIR = Path("C:/PersonalSites")
 ARCHIVE_DIR = BASE_DIR / "_archive"
 META_FILE = BASE_DIR / "sites.json"
 
-# Cache for port checking to avoid repeated socket operations
-_port_cache = {}
+# DEFLATE level for archives; level 1 is several times faster than the default 6
+# for a small size cost. Override with SITE_MGR_COMPRESSION (0-12). Each backend
+# clamps it to what it accepts: zipfile/zlib 0-9, libdeflate 1-12.
+def _compression_level():
+    try:
+        level = int(os.environ.get("SITE_MGR_COMPRESSION", "1"))
+    except ValueError:
+        return 1
+    return min(max(level, 0), 12)
+
+COMPRESSION_LEVEL = _compression_level()
+_ZLIB_LEVEL = min(COMPRESSION_LEVEL, 9)
+_LIBDEFLATE_LEVEL = max(COMPRESSION_LEVEL, 1)
+
+# Already-compressed formats are stored as-is; deflating them again only burns CPU
+INCOMPRESSIBLE = frozenset({
+    ".png", ".jpg", ".jpeg", ".gif", ".webp", ".mp3", ".mp4", ".webm",
+    ".ogg", ".zip", ".gz", ".woff", ".woff2", ".pdf",
+})
+
+# The libdeflate writer reads each member whole and emits no ZIP64 records;
+# trees beyond these limits are archived with zipfile instead
+_DEFLATE_MAX_FILE = 64 * 1024 * 1024
+_DEFLATE_MAX_TOTAL = 2 * 1024 * 1024 * 1024
+_DEFLATE_MAX_ENTRIES = 65535
+
+# Buffer size for streaming archive members to disk on restore
+_COPY_BUFSIZE = 256 * 1024
+
+# Cache for port checking to avoid repeated socket operations.
+# A flat list indexed by port - _PORT_BASE; grows on demand.
+_PORT_BASE = 5000
+_port_cache = [(False, 0.0)] * 1024
 _cache_timeout = 2.0  # seconds
 
 def load_metadata():
-    if META_FILE.exists():
-        try:
-            return json.loads(META_FILE.read_text(encoding="utf-8"))
-        except json.JSONDecodeError:
-            return {}
-    return {}
+    # A single read; a missing or corrupt file both mean "no sites yet"
+    try:
+        data = META_FILE.read_bytes()
+    except FileNotFoundError:
+        return {}
+    try:
+        return orjson.loads(data) if orjson is not None else json.loads(data)
+    except ValueError:
+        return {}
 
 def save_metadata(data):
     # Use atomic write to prevent corruption
     temp_file = META_FILE.with_suffix('.tmp')
-    temp_file.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    if orjson is not None:
+        temp_file.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        temp_file.write_text(json.dumps(data, indent=2), encoding="utf-8")
     temp_file.replace(META_FILE)
 
 def get_used_ports(meta):
@@ -51,97 +101,238 @@ def get_used_ports(meta):
             used.add(port)
     return used
 
-def get_next_port(meta):
-    port = 5000
-    used = get_used_ports(meta)
-    while port in used:
-        port += 1
-    return port
+def _bind_conflicts(port):
+    """True if binding 127.0.0.1:port fails with EADDRINUSE"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 0)
+        try:
+            s.bind(("127.0.0.1", port))
+        except OSError as e:
+            # WSAEADDRINUSE is 10048 on Windows
+            return e.errno == errno.EADDRINUSE or getattr(e, "winerror", None) == 10048
+    return False
+
+def _listening(ports, timeout=0.25):
+    """Confirm listeners with one batch of non-blocking connects; returns the ports that accepted"""
+    found = set()
+    sel = selectors.DefaultSelector()
+    try:
+        for port in ports:
+            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            s.setblocking(False)
+            err = s.connect_ex(("127.0.0.1", port))
+            if err == 0:
+                found.add(port)
+                s.close()
+            elif err in (errno.EINPROGRESS, errno.EWOULDBLOCK, 10035):  # 10035: WSAEWOULDBLOCK
+                sel.register(s, selectors.EVENT_WRITE, port)
+            else:
+                s.close()
+        deadline = time.monotonic() + timeout
+        while sel.get_map():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            for key, _ in sel.select(remaining):
+                if key.fileobj.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) == 0:
+                    found.add(key.data)
+                sel.unregister(key.fileobj)
+                key.fileobj.close()
+    finally:
+        for key in list(sel.get_map().values()):
+            key.fileobj.close()
+        sel.close()
+    return found
 
-def port_in_use(port):
-    """Cached port checking with timeout"""
+def ports_in_use(ports):
+    """Check several ports; returns {port: in_use}. Only in-use results are cached"""
     current_time = time.time()
-    cache_key = f"port_{port}"
-    
-    if cache_key in _port_cache:
-        cached_result, timestamp = _port_cache[cache_key]
-        if current_time - timestamp < _cache_timeout:
-            return cached_result
+    result = {}
+    suspects = []
+    for port in set(ports):
+        idx = port - _PORT_BASE
+        if 0 <= idx < len(_port_cache):
+            cached_result, timestamp = _port_cache[idx]
+            if current_time - timestamp < _cache_timeout:
+                result[port] = cached_result
+                continue
+        # A free port binds without exchanging any packets
+        if _bind_conflicts(port):
+            suspects.append(port)
+        else:
+            result[port] = False
     
-    # Actual port check with timeout
-    try:
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-            s.settimeout(1.0)  # 1 second timeout
-            result = s.connect_ex(("127.0.0.1", port)) == 0
-            _port_cache[cache_key] = (result, current_time)
-            return result
-    except:
-        return False
+    # EADDRINUSE is also raised while a stopped server's connections sit in
+    # TIME_WAIT, so confirm there is a listener. Windows retries SYNs after a
+    # loopback RST, so a refused connect can take the full timeout; all
+    # suspects share one batch and one timeout instead of paying it each.
+    listening = _listening(suspects) if suspects else set()
+    for port in suspects:
+        result[port] = port in listening
+        idx = port - _PORT_BASE
+        if port in listening and idx >= 0:
+            if idx >= len(_port_cache):
+                _port_cache.extend([(False, 0.0)] * (idx + 1 - len(_port_cache)))
+            _port_cache[idx] = (True, current_time)
+    return result
+
+def port_in_use(port):
+    """Check a single port; see ports_in_use"""
+    return ports_in_use((port,))[port]
 
 def clear_port_cache():
     """Clear port cache - call this when making changes"""
-    _port_cache.clear()
+    _port_cache[:] = [(False, 0.0)] * len(_port_cache)
 
-class SiteThread(QThread):
-    finished = pyqtSignal(str, bool)
-    
-    def __init__(self, name, base, action, port=None):
-        super().__init__()
-        self.name = name
-        self.base = base
-        self.action = action
-        self.port = port
-    
-    def run(self):
-        try:
-            if self.action == "create": 
-                self.create_site()
-            elif self.action == "start": 
-                self.start_site()
-            elif self.action == "archive": 
-                self.archive_site()
-            elif self.action == "restore": 
-                self.restore_site()
-        except Exception as e:
-            self.finished.emit(str(e), False)
+def _dos_datetime(mtime):
+    """Convert a timestamp to the (time, date) pair stored in ZIP headers"""
+    t = time.localtime(mtime)
+    if t.tm_year < 1980:
+        return 0, (1 << 5) | 1
+    return ((t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2),
+            ((t.tm_year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday)
 
-    def create_site(self):
-        site_dir = self.base / self.name
-        if site_dir.exists():
-            self.finished.emit("Site folder already exists", False)
-            return
-        
-        static_dir = site_dir / "static" / "css"
-        templates_dir = site_dir / "templates"
-        for d in [site_dir, static_dir, templates_dir]:
-            d.mkdir(parents=True, exist_ok=True)
-        
-        # Create CSS file
-        (static_dir / "style.css").write_text(
-            "body{font-family:'Segoe UI';background:linear-gradient(135deg,#667eea,#764ba2);"
-            "margin:0;padding:0;color:#fff;text-align:center;}", 
-            encoding="utf-8"
-        )
-        
-        # Create HTML template
-        (templates_dir / "index.html").write_text(
-            f"""<!DOCTYPE html>
+def scan_site_files(site_dir):
+    """List (path, arcname, mtime, size) for every file under site_dir using os.scandir"""
+    files = []
+    stack = [(os.fspath(site_dir), "")]
+    while stack:
+        dir_path, prefix = stack.pop()
+        with os.scandir(dir_path) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append((entry.path, f"{prefix}{entry.name}/"))
+                elif entry.is_file():
+                    st = entry.stat()
+                    files.append((entry.path, prefix + entry.name, st.st_mtime, st.st_size))
+    return files
+
+def _deflate_file(path, level):
+    """Read and compress one file; returns (size, crc, method, payload)"""
+    with open(path, "rb") as f:
+        data = f.read()
+    crc = deflate.crc32(data)
+    if os.path.splitext(path)[1].lower() in INCOMPRESSIBLE:
+        return len(data), crc, zipfile.ZIP_STORED, data
+    return len(data), crc, zipfile.ZIP_DEFLATED, deflate.deflate_compress(data, level)
+
+def _rmtree_scandir(path):
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                _rmtree_scandir(entry.path)
+            else:
+                os.remove(entry.path)
+    os.rmdir(path)
+
+def fast_rmtree(path):
+    """Post-order delete over os.scandir; falls back to shutil.rmtree on errors (e.g. locked files)"""
+    try:
+        _rmtree_scandir(path)
+    except FileNotFoundError:
+        pass
+    except OSError:
+        shutil.rmtree(path, ignore_errors=True)
+
+def fits_deflate_zip(files):
+    """True if write_deflate_zip can handle these files without ZIP64"""
+    return (len(files) < _DEFLATE_MAX_ENTRIES
+            and sum(f[3] for f in files) < _DEFLATE_MAX_TOTAL
+            and all(f[3] <= _DEFLATE_MAX_FILE for f in files))
+
+def write_deflate_zip(archive_path, files, level=_LIBDEFLATE_LEVEL):
+    """Write (path, arcname, mtime, size) entries to a ZIP, deflating each file in one libdeflate call"""
+    central = bytearray()
+    count = 0
+    # One file at a time: the deflate binding holds the GIL, so a thread pool
+    # would not overlap compression and would only keep more files in memory
+    with open(archive_path, "wb") as out:
+        for path, arcname, mtime, _ in files:
+            size, crc, method, comp = _deflate_file(path, level)
+            dtime, ddate = _dos_datetime(mtime)
+            name = arcname.encode("utf-8")
+            offset = out.tell()
+            # Local file header (flag 0x800: UTF-8 names)
+            out.write(struct.pack("<IHHHHHIIIHH", 0x04034B50, 20, 0x800, method, dtime, ddate,
+                                  crc, len(comp), size, len(name), 0))
+            out.write(name)
+            out.write(comp)
+            central += struct.pack("<IHHHHHHIIIHHHHHII", 0x02014B50, 20, 20, 0x800, method, dtime, ddate,
+                                   crc, len(comp), size, len(name), 0, 0, 0, 0, 0, offset)
+            central += name
+            count += 1
+        cd_offset = out.tell()
+        out.write(central)
+        out.write(struct.pack("<IHHHHIIH", 0x06054B50, 0, 0, count, count,
+                              len(central), cd_offset, 0))
+
+def _member_dest(root, filename):
+    """Resolve an archive member path under root, rejecting path traversal"""
+    dest = (root / filename).resolve()
+    if root not in dest.parents:
+        raise zipfile.BadZipFile(f"Unsafe path in archive: {filename}")
+    return dest
+
+def read_deflate_zip(archive_path, extract_path):
+    """Extract a ZIP, inflating each entry in one libdeflate call"""
+    root = extract_path.resolve()
+    with zipfile.ZipFile(archive_path, "r") as z, open(archive_path, "rb") as f:
+        for info in z.infolist():
+            if info.is_dir():
+                continue
+            dest = _member_dest(root, info.filename)
+            if info.file_size > _DEFLATE_MAX_FILE:
+                # Too big to hold in memory; stream it like extract_zip does
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                with z.open(info) as src, open(dest, "wb") as dst:
+                    shutil.copyfileobj(src, dst, length=_COPY_BUFSIZE)
+                continue
+            if info.compress_type in (zipfile.ZIP_DEFLATED, zipfile.ZIP_STORED):
+                # Skip the local header to reach the raw member data
+                f.seek(info.header_offset + 26)
+                name_len, extra_len = struct.unpack("<HH", f.read(4))
+                f.seek(name_len + extra_len, 1)
+                raw = f.read(info.compress_size)
+                if info.compress_type == zipfile.ZIP_DEFLATED:
+                    data = deflate.deflate_decompress(raw, info.file_size)
+                else:
+                    data = raw
+                if deflate.crc32(data) != info.CRC:
+                    raise zipfile.BadZipFile(f"Bad CRC-32 for {info.filename}")
+            else:
+                data = z.read(info)
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            dest.write_bytes(data)
+
+def extract_zip(archive_path, extract_path):
+    """Extract a ZIP with zipfile, streaming each member straight to disk"""
+    root = extract_path.resolve()
+    with zipfile.ZipFile(archive_path, "r") as z:
+        for info in z.infolist():
+            if info.is_dir():
+                continue
+            dest = _member_dest(root, info.filename)
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            with z.open(info) as src, open(dest, "wb") as dst:
+                shutil.copyfileobj(src, dst, length=_COPY_BUFSIZE)
+
+# Skeleton files for new sites, pre-encoded; only the name/port slots vary
+_STYLE_CSS = (b"body{font-family:'Segoe UI';background:linear-gradient(135deg,#667eea,#764ba2);"
+              b"margin:0;padding:0;color:#fff;text-align:center;}")
+
+_INDEX_HTML = b"""<!DOCTYPE html>
 <html>
 <head>
-    <title>{self.name}</title>
-    <link rel='stylesheet' href='{{{{ url_for("static",filename="css/style.css") }}}}'>
+    <title>__NAME__</title>
+    <link rel='stylesheet' href='{{ url_for("static",filename="css/style.css") }}'>
 </head>
 <body>
-    <h1>Welcome to {self.name}</h1>
+    <h1>Welcome to __NAME__</h1>
     <p>Flask site running.</p>
 </body>
-</html>""", 
-            encoding="utf-8"
-        )
-        
-        # Create main app
-        (site_dir / "app.py").write_text(
-            f"""from flask import Flask, render_template
+</html>"""
+
+_APP_PY = b"""from flask import Flask, render_template
 
 app = Flask(__name__)
 
@@ -150,64 +341,198 @@ def home():
     return render_template('index.html')
 
 if __name__ == '__main__':
-    app.run(debug=True, host='127.0.0.1', port={self.port})
-""", 
-            encoding="utf-8"
-        )
-        
-        # Create run script
-        (site_dir / "run_site.py").write_text(
-            f"""import sys
+    app.run(debug=True, host='127.0.0.1', port=__PORT__)
+"""
+
+_RUN_SITE_PY = b"""import sys
 import os
 from app import app
 
 if __name__ == '__main__':
-    print('Running http://127.0.0.1:{self.port}')
-    app.run(debug=True, host='127.0.0.1', port={self.port})
-""", 
-            encoding="utf-8"
-        )
+    print('Running http://127.0.0.1:__PORT__')
+    app.run(debug=True, host='127.0.0.1', port=__PORT__)
+"""
+
+def kill_process_tree(proc):
+    """Kill a site process we started, including its child processes"""
+    # poll() confirms our own child is still alive, so its PID can't have been reused
+    if proc.poll() is not None:
+        return
+    try:
+        # /T also takes down the Werkzeug reloader's child, which serves the port
+        subprocess.run(["taskkill", "/PID", str(proc.pid), "/T", "/F"],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    except OSError:
+        proc.kill()
+
+class SiteWorker(QThread):
+    """Single long-lived worker that runs queued site jobs one after another"""
+    job_done = pyqtSignal(object, object, bool)
+    output = pyqtSignal(str, str)
+    
+    def __init__(self, base):
+        super().__init__()
+        self.base = base
+        self._base_str = os.fspath(base)
+        self.jobs = queue.Queue()
+    
+    def submit(self, action, name, callback, port=None):
+        """Queue a job; callback(result, ok) is invoked on the GUI thread when it finishes.
+        result is a message string, or the Popen for a successful "start"."""
+        self.jobs.put((action, name, port, callback))
+    
+    def stop(self):
+        self.jobs.put(None)
+        self.wait()
+    
+    def run(self):
+        handlers = {
+            "create": self.create_site,
+            "start": self.start_site,
+            "archive": self.archive_site,
+            "restore": self.restore_site,
+        }
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                break
+            action, name, port, callback = job
+            try:
+                msg, ok = handlers[action](name, port)
+            except Exception as e:
+                msg, ok = str(e), False
+            self.job_done.emit(callback, msg, ok)
+
+    def create_site(self, name, port):
+        site_dir = self.base / name
+        if site_dir.exists():
+            return "Site folder already exists", False
         
-        self.finished.emit(f"Site '{self.name}' created at http://127.0.0.1:{self.port}", True)
+        static_dir = site_dir / "static" / "css"
+        templates_dir = site_dir / "templates"
+        for d in [site_dir, static_dir, templates_dir]:
+            d.mkdir(parents=True, exist_ok=True)
+        
+        name_b = name.encode("utf-8")
+        port_b = str(port).encode("ascii")
+        (static_dir / "style.css").write_bytes(_STYLE_CSS)
+        (templates_dir / "index.html").write_bytes(_INDEX_HTML.replace(b"__NAME__", name_b))
+        (site_dir / "app.py").write_bytes(_APP_PY.replace(b"__PORT__", port_b))
+        (site_dir / "run_site.py").write_bytes(_RUN_SITE_PY.replace(b"__PORT__", port_b))
+        
+        return f"Site '{name}' created at http://127.0.0.1:{port}", True
 
-    def start_site(self):
-        run_script = self.base / self.name / "run_site.py"
-        if run_script.exists():
+    def start_site(self, name, port):
+        cwd = os.path.join(self._base_str, name)
+        run_script = os.path.join(cwd, "run_site.py")
+        if os.path.isfile(run_script):
+            # No console window; the site's output is piped into the GUI log instead
             proc = subprocess.Popen(
-                [sys.executable, str(run_script)],
-                cwd=str(run_script.parent),
-                creationflags=subprocess.CREATE_NEW_CONSOLE
+                [sys.executable, run_script],
+                cwd=cwd,
+                creationflags=subprocess.CREATE_NEW_PROCESS_GROUP | subprocess.CREATE_NO_WINDOW,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                encoding="utf-8",
+                errors="replace",
+                bufsize=1,
+                env={**os.environ, "PYTHONUNBUFFERED": "1", "PYTHONIOENCODING": "utf-8"}
             )
-            self.finished.emit(str(proc.pid), True)
+            threading.Thread(target=self._pump_output, args=(name, proc), daemon=True).start()
+            return proc, True
         else:
-            self.finished.emit("run_site.py not found.", False)
+            return "run_site.py not found.", False
 
-    def archive_site(self):
-        site_dir = self.base / self.name
+    def _pump_output(self, name, proc):
+        """Forward a site's stdout/stderr lines until the process exits"""
+        with proc.stdout:
+            for line in proc.stdout:
+                self.output.emit(name, line.rstrip())
+
+    def archive_site(self, name, port):
+        site_dir = self.base / name
         ARCHIVE_DIR.mkdir(exist_ok=True)
-        archive_path = ARCHIVE_DIR / f"{self.name}.zip"
+        archive_path = ARCHIVE_DIR / f"{name}.zip"
         
-        with zipfile.ZipFile(archive_path, "w", zipfile.ZIP_DEFLATED) as z:
-            for root, _, files in os.walk(site_dir):
-                for f in files:
-                    fp = Path(root) / f
-                    z.write(fp, fp.relative_to(site_dir))
+        files = scan_site_files(site_dir)
+        try:
+            if deflate is not None and fits_deflate_zip(files):
+                write_deflate_zip(archive_path, files)
+            else:
+                with zipfile.ZipFile(archive_path, "w", zipfile.ZIP_DEFLATED,
+                                     compresslevel=_ZLIB_LEVEL) as z:
+                    for path, arcname, _, _ in files:
+                        compress_type = (zipfile.ZIP_STORED
+                                         if os.path.splitext(path)[1].lower() in INCOMPRESSIBLE
+                                         else zipfile.ZIP_DEFLATED)
+                        z.write(path, arcname, compress_type=compress_type)
+        except Exception:
+            # Never leave a truncated archive behind in _archive
+            archive_path.unlink(missing_ok=True)
+            raise
         
-        shutil.rmtree(site_dir, ignore_errors=True)
-        self.finished.emit(f"Archived {self.name}", True)
+        fast_rmtree(site_dir)
+        return f"Archived {name}", True
 
-    def restore_site(self):
-        archive_path = ARCHIVE_DIR / f"{self.name}.zip"
+    def restore_site(self, name, port):
+        archive_path = ARCHIVE_DIR / f"{name}.zip"
         if not archive_path.exists():
-            self.finished.emit("Archive not found.", False)
-            return
+            return "Archive not found.", False
         
-        extract_path = BASE_DIR / self.name
-        with zipfile.ZipFile(archive_path, 'r') as z:
-            extract_path.mkdir(parents=True, exist_ok=True)
-            z.extractall(extract_path)
+        extract_path = BASE_DIR / name
+        extract_path.mkdir(parents=True, exist_ok=True)
+        if deflate is not None:
+            read_deflate_zip(archive_path, extract_path)
+        else:
+            extract_zip(archive_path, extract_path)
         
-        self.finished.emit(f"Restored {self.name}", True)
+        return f"Restored {name}", True
+
+class SiteListModel(QAbstractListModel):
+    """List of (name, port, running) rows; only rows whose state flips are reformatted and repainted"""
+    def __init__(self, archived=False):
+        super().__init__()
+        self.archived = archived
+        self.rows = []
+        self._text = []
+    
+    def _format(self, row):
+        name, port, running = row
+        if self.archived:
+            return f"{name} (Archived)"
+        status = "Running" if running else "Stopped"
+        return f"{name} ({status})  http://127.0.0.1:{port}"
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            return self._text[index.row()]
+        if role == Qt.ForegroundRole:
+            if self.archived:
+                return QBrush(Qt.darkMagenta)
+            return QBrush(Qt.green if self.rows[index.row()][2] else Qt.gray)
+        return None
+    
+    def set_rows(self, rows):
+        # Adding/removing/reordering sites resets the view; status flips only
+        # reformat and emit dataChanged for the affected rows
+        if [r[0] for r in rows] != [r[0] for r in self.rows]:
+            self.beginResetModel()
+            self.rows = rows
+            self._text = [self._format(r) for r in rows]
+            self.endResetModel()
+            return
+        old, self.rows = self.rows, rows
+        for i, (before, after) in enumerate(zip(old, rows)):
+            if before != after:
+                self._text[i] = self._format(after)
+                idx = self.index(i)
+                self.dataChanged.emit(idx, idx, [Qt.DisplayRole, Qt.ForegroundRole])
 
 class Button(QPushButton):
     def __init__(self, text):
@@ -226,10 +551,54 @@ class FlaskManager(QMainWindow):
         BASE_DIR.mkdir(parents=True, exist_ok=True)
         ARCHIVE_DIR.mkdir(parents=True, exist_ok=True)
         self.meta = load_metadata()
-        self.thread = None
+        # Run state is derived live. Legacy status/pid fields are dropped; old
+        # PIDs may have been reused, so only processes started now are tracked,
+        # by their Popen handle.
+        self._procs = {}
+        for data in self.meta.values():
+            data.pop("status", None)
+            data.pop("pid", None)
+        # Highest port handed out so far; new sites get the next one up
+        self._max_port = max(get_used_ports(self.meta), default=4999)
+        self.worker = SiteWorker(BASE_DIR)
+        self.worker.job_done.connect(self.on_job_done)
+        self.worker.output.connect(self.on_site_output)
+        self.worker.start()
         self._refresh_in_progress = False
+        self._prev_state = None
+        # Sites with a queued or running worker job
+        self._pending = set()
         self.setup_ui()
 
+    def submit_job(self, action, name, callback, port=None):
+        """Queue a worker job for a site and mark it busy until the callback runs"""
+        self._pending.add(name)
+        def done(result, ok):
+            self._pending.discard(name)
+            callback(result, ok)
+        self.worker.submit(action, name, done, port)
+
+    def is_busy(self, name):
+        if name in self._pending:
+            self.statusBar().showMessage(f"{name} is busy, wait for its current job to finish", 3000)
+            return True
+        return False
+
+    def on_job_done(self, callback, msg, ok):
+        """Runs on the GUI thread for every finished worker job"""
+        callback(msg, ok)
+
+    def on_site_output(self, name, line):
+        self.log.setVisible(True)
+        self.log.append(f"[{name}] {line}")
+
+    def closeEvent(self, event):
+        # Sites run without a console, so don't leave them serving invisibly
+        for name in list(self._procs):
+            self.kill_site(name)
+        self.worker.stop()
+        super().closeEvent(event)
+
     def setup_ui(self):
         self.setWindowTitle("Flask Site Manager")
         self.resize(940, 660)
@@ -279,6 +648,7 @@ class FlaskManager(QMainWindow):
         self.log = QTextEdit()
         self.log.setReadOnly(True)
         self.log.setMaximumHeight(120)
+        self.log.document().setMaximumBlockCount(500)
         self.log.setStyleSheet(f"{font_css} background:#f5f5f5;")
         self.log.setVisible(False)
         c_layout.addWidget(self.log)
@@ -293,21 +663,26 @@ class FlaskManager(QMainWindow):
         lbl.setStyleSheet(font_css)
         m_layout.addWidget(lbl)
         
-        self.active_list = QListWidget()
+        self.active_model = SiteListModel()
+        self.active_list = QListView()
+        self.active_list.setModel(self.active_model)
         self.active_list.setStyleSheet(f"{font_css} alternate-background-color: #f8f9fa;")
         self.active_list.setAlternatingRowColors(True)
-        self.active_list.itemSelectionChanged.connect(self.on_selection_changed)
+        self.active_list.selectionModel().selectionChanged.connect(lambda *_: self.on_selection_changed())
+        # A reset clears the selection without emitting selectionChanged
+        self.active_model.modelReset.connect(self.on_selection_changed)
         m_layout.addWidget(self.active_list)
         
         # Button container
         hl2 = QHBoxLayout()
         self.start_btn = Button("Start")
+        self.stop_btn = Button("Stop")
         self.open_btn = Button("Open Browser")
         self.folder_btn = Button("Open Folder")
         self.archive_btn = Button("Archive")
         self.delete_btn = Button("Delete")
         
-        for b in [self.start_btn, self.open_btn, self.folder_btn, self.archive_btn, self.delete_btn]:
+        for b in [self.start_btn, self.stop_btn, self.open_btn, self.folder_btn, self.archive_btn, self.delete_btn]:
             hl2.addWidget(b)
             b.setEnabled(False)
         
@@ -322,10 +697,13 @@ class FlaskManager(QMainWindow):
         lbl2.setStyleSheet(font_css)
         r_layout.addWidget(lbl2)
         
-        self.arch_list = QListWidget()
+        self.arch_model = SiteListModel(archived=True)
+        self.arch_list = QListView()
+        self.arch_list.setModel(self.arch_model)
         self.arch_list.setStyleSheet(f"{font_css} alternate-background-color: #f8f9fa;")
         self.arch_list.setAlternatingRowColors(True)
-        self.arch_list.itemSelectionChanged.connect(self.on_arch_selection_changed)
+        self.arch_list.selectionModel().selectionChanged.connect(lambda *_: self.on_arch_selection_changed())
+        self.arch_model.modelReset.connect(self.on_arch_selection_changed)
         r_layout.addWidget(self.arch_list)
         
         hl3 = QHBoxLayout()
@@ -340,6 +718,7 @@ class FlaskManager(QMainWindow):
 
         # Connections
         self.start_btn.clicked.connect(self.start_site)
+        self.stop_btn.clicked.connect(self.stop_site)
         self.open_btn.clicked.connect(self.open_browser)
         self.folder_btn.clicked.connect(self.open_folder)
         self.archive_btn.clicked.connect(self.archive_site)
@@ -360,16 +739,21 @@ class FlaskManager(QMainWindow):
 
     def on_selection_changed(self):
         """Enable/disable buttons based on selection"""
-        has_selection = bool(self.active_list.selectedItems())
-        for btn in [self.start_btn, self.open_btn, self.folder_btn, self.archive_btn, self.delete_btn]:
+        has_selection = self.active_list.selectionModel().hasSelection()
+        for btn in [self.start_btn, self.stop_btn, self.open_btn, self.folder_btn, self.archive_btn, self.delete_btn]:
             btn.setEnabled(has_selection)
 
     def on_arch_selection_changed(self):
         """Enable/disable archive buttons based on selection"""
-        has_selection = bool(self.arch_list.selectedItems())
+        has_selection = self.arch_list.selectionModel().hasSelection()
         self.restore_btn.setEnabled(has_selection)
         self.del_arch_btn.setEnabled(has_selection)
 
+    def reserve_port(self):
+        """Hand out the next port as soon as a job is queued, so queued jobs never share one"""
+        self._max_port += 1
+        return self._max_port
+
     def create_site(self):
         name = self.input.text().strip().lower()
         if not name:
@@ -378,11 +762,11 @@ class FlaskManager(QMainWindow):
         if ' ' in name:
             QMessageBox.warning(self, "Invalid", "Site name cannot contain spaces.")
             return
-        if name in self.meta:
+        if name in self.meta or name in self._pending:
             QMessageBox.warning(self, "Exists", "Site already exists.")
             return
 
-        port = get_next_port(self.meta)
+        port = self.reserve_port()
         
         self.create_btn.setEnabled(False)
         self.input.setEnabled(False)
@@ -392,9 +776,7 @@ class FlaskManager(QMainWindow):
         # Clear cache since we're making changes
         clear_port_cache()
         
-        self.thread = SiteThread(name, BASE_DIR, "create", port)
-        self.thread.finished.connect(lambda msg, ok: self.create_done(name, port, msg, ok))
-        self.thread.start()
+        self.submit_job("create", name, lambda msg, ok: self.create_done(name, port, msg, ok), port)
 
     def create_done(self, name, port, msg, ok):
         self.create_btn.setEnabled(True)
@@ -403,7 +785,7 @@ class FlaskManager(QMainWindow):
         self.input.clear()
         
         if ok:
-            self.meta[name] = {"port": port, "pid": None, "status": "Stopped", "archived": False}
+            self.meta[name] = {"port": port, "archived": False}
             save_metadata(self.meta)
             self.load_sites()
             clear_port_cache()
@@ -414,45 +796,37 @@ class FlaskManager(QMainWindow):
         if not ok:
             QMessageBox.critical(self, "Error", msg)
 
-    def load_sites(self):
-        """Optimized site loading - only update if changed"""
-        current_active = []
-        current_archived = []
-        
-        # Build current state
+    def site_state(self):
+        """Snapshot of (name, port, running, archived) for every site"""
+        # Sites we launched are checked through their process handle; poll() is a
+        # zero-timeout wait, can't be fooled by PID reuse and reaps exited children.
+        # Exited ones are forgotten and fall back to the port probe.
+        alive = set()
+        for name, proc in list(self._procs.items()):
+            if proc.poll() is None:
+                alive.add(name)
+            else:
+                del self._procs[name]
+        running = ports_in_use(data["port"] for name, data in self.meta.items()
+                               if not data.get("archived") and name not in alive)
+        state = []
         for name, data in self.meta.items():
             if data.get("archived"):
-                current_archived.append(f"{name} (Archived)")
+                state.append((name, data.get("port"), False, True))
             else:
-                status = "Running" if port_in_use(data["port"]) else "Stopped"
-                current_active.append(f"{name} ({status})  http://127.0.0.1:{data['port']}")
+                state.append((name, data["port"], name in alive or running[data["port"]], False))
+        return state
+
+    def load_sites(self, state=None):
+        """Optimized site loading - nothing is formatted or repainted unless state changed"""
+        if state is None:
+            state = self.site_state()
+        if state == self._prev_state:
+            return
+        self._prev_state = state
         
-        # Check if active list needs update
-        active_needs_update = False
-        if len(current_active) != self.active_list.count():
-            active_needs_update = True
-        else:
-            for i in range(len(current_active)):
-                if self.active_list.item(i).text() != current_active[i]:
-                    active_needs_update = True
-                    break
-        
-        # Update active list if changed
-        if active_needs_update:
-            self.active_list.clear()
-            for item_text in current_active:
-                item = QListWidgetItem(item_text)
-                item.setForeground(Qt.green if "Running" in item_text else Qt.gray)
-                self.active_list.addItem(item)
-        
-        # Check if archived list needs update
-        archived_needs_update = (len(current_archived) != self.arch_list.count())
-        if archived_needs_update:
-            self.arch_list.clear()
-            for item_text in current_archived:
-                item = QListWidgetItem(item_text)
-                item.setForeground(Qt.darkMagenta)
-                self.arch_list.addItem(item)
+        self.active_model.set_rows([s[:3] for s in state if not s[3]])
+        self.arch_model.set_rows([s[:3] for s in state if s[3]])
 
     def refresh_status(self):
         """Optimized status refresh with debouncing"""
@@ -460,37 +834,18 @@ class FlaskManager(QMainWindow):
             return
             
         self._refresh_in_progress = True
-        changed = False
-        
-        # Check only non-archived sites
-        sites_to_check = {name: data for name, data in self.meta.items() 
-                         if not data.get("archived")}
-        
-        for name, data in sites_to_check.items():
-            port = data["port"]
-            is_running = port_in_use(port)
-            
-            if is_running and data["status"] != "Running":
-                data["status"] = "Running"
-                changed = True
-            elif not is_running and data["status"] != "Stopped":
-                data["status"] = "Stopped"
-                data["pid"] = None
-                changed = True
-        
-        if changed:
-            save_metadata(self.meta)
-            self.load_sites()
         
+        # Nothing here is persisted
+        self.load_sites(self.site_state())
         self._refresh_in_progress = False
 
     def get_selected(self, archived=False):
         lst = self.arch_list if archived else self.active_list
-        items = lst.selectedItems()
-        if not items:
+        indexes = lst.selectionModel().selectedIndexes()
+        if not indexes:
             QMessageBox.warning(self, "Error", "Please select a site.")
             return None
-        return items[0].text().split()[0]
+        return lst.model().rows[indexes[0].row()][0]
 
     def start_site(self):
         name = self.get_selected(False)
@@ -500,24 +855,59 @@ class FlaskManager(QMainWindow):
         if self.meta[name].get("archived"):
             QMessageBox.warning(self, "Archived", "Cannot start archived sites.")
             return
+        if self.is_busy(name):
+            return
+        if self.is_running_here(name):
+            self.statusBar().showMessage(f"{name} is already running", 3000)
+            return
             
         self.statusBar().showMessage(f"Starting {name}...")
-        self.thread = SiteThread(name, BASE_DIR, "start")
-        self.thread.finished.connect(lambda pid, ok: self.started(name, pid, ok))
-        self.thread.start()
+        self.submit_job("start", name, lambda proc, ok: self.started(name, proc, ok))
 
-    def started(self, name, pid, ok):
+    def started(self, name, proc, ok):
         if ok:
-            self.meta[name]["pid"] = int(pid)
-            self.meta[name]["status"] = "Running"
-            save_metadata(self.meta)
+            if not self.track_started(name, proc):
+                self.statusBar().showMessage(f"{name} is already running", 3000)
+                return
             clear_port_cache()
             self.load_sites()
             self.statusBar().showMessage(f"{name} started successfully", 3000)
         else:
-            QMessageBox.critical(self, "Error", pid)
+            QMessageBox.critical(self, "Error", proc)
             self.statusBar().showMessage(f"Failed to start {name}", 3000)
 
+    def stop_site(self):
+        name = self.get_selected(False)
+        if not name or self.is_busy(name): 
+            return
+            
+        if name not in self._procs:
+            self.statusBar().showMessage(f"{name} was not started from this window", 3000)
+            return
+        self.kill_site(name)
+        clear_port_cache()
+        self.load_sites()
+        self.statusBar().showMessage(f"Stopped {name}", 3000)
+
+    def kill_site(self, name):
+        """Kill a site process started this session, including its child processes"""
+        proc = self._procs.pop(name, None)
+        if proc is not None:
+            kill_process_tree(proc)
+
+    def is_running_here(self, name):
+        """True if a process this session started for the site is still alive"""
+        proc = self._procs.get(name)
+        return proc is not None and proc.poll() is None
+
+    def track_started(self, name, proc):
+        """Record a freshly started site; never drop the handle of a live one"""
+        if self.is_running_here(name):
+            kill_process_tree(proc)
+            return False
+        self._procs[name] = proc
+        return True
+
     def open_browser(self):
         name = self.get_selected(False)
         if not name: 
@@ -527,21 +917,24 @@ class FlaskManager(QMainWindow):
         if port_in_use(port):
             webbrowser.open(f"http://127.0.0.1:{port}")
             self.statusBar().showMessage(f"Opened {name} in browser", 2000)
-        else:
+        elif self.is_running_here(name):
+            # Started but not listening yet; give it a moment instead of starting it twice
+            QTimer.singleShot(800, lambda: webbrowser.open(f"http://127.0.0.1:{port}"))
+            self.statusBar().showMessage(f"{name} is still starting, opening browser shortly", 3000)
+        elif not self.is_busy(name):
             self.statusBar().showMessage(f"Starting {name}...")
-            self.thread = SiteThread(name, BASE_DIR, "start")
-            self.thread.finished.connect(lambda pid, ok: self.auto_open(name, pid, ok))
-            self.thread.start()
+            self.submit_job("start", name, lambda proc, ok: self.auto_open(name, proc, ok))
 
-    def auto_open(self, name, pid, ok):
+    def auto_open(self, name, proc, ok):
         if ok:
-            self.meta[name]["pid"] = int(pid)
-            self.meta[name]["status"] = "Running"
-            save_metadata(self.meta)
+            if not self.track_started(name, proc):
+                self.statusBar().showMessage(f"{name} is already running", 3000)
+                return
             clear_port_cache()
             self.load_sites()
             # Reduced delay
-            QTimer.singleShot(800, lambda: webbrowser.open(f"http://127.0.0.1:{self.meta[name]['port']}"))
+            port = self.meta[name]["port"]
+            QTimer.singleShot(800, lambda: webbrowser.open(f"http://127.0.0.1:{port}"))
             self.statusBar().showMessage(f"{name} started and opened in browser", 3000)
         else:
             QMessageBox.critical(self, "Error", f"Failed to start {name}")
@@ -561,20 +954,21 @@ class FlaskManager(QMainWindow):
 
     def archive_site(self):
         name = self.get_selected(False)
-        if not name: 
+        if not name or self.is_busy(name): 
             return
             
         if QMessageBox.question(self, "Confirm Archive", 
                               f"Archive site '{name}'? This will stop the site and compress it.") == QMessageBox.Yes:
             self.statusBar().showMessage(f"Archiving {name}...")
-            self.thread = SiteThread(name, BASE_DIR, "archive")
-            self.thread.finished.connect(lambda msg, ok: self.archived_done(name, msg, ok))
-            self.thread.start()
+            self.kill_site(name)
+            self.submit_job("archive", name, lambda msg, ok: self.archived_done(name, msg, ok))
 
     def archived_done(self, name, msg, ok):
+        if name not in self.meta:
+            return
         if ok:
             self.meta[name]["archived"] = True
-            self.meta[name]["status"] = "Archived"
+            self._procs.pop(name, None)
             save_metadata(self.meta)
             clear_port_cache()
             self.load_sites()
@@ -585,18 +979,18 @@ class FlaskManager(QMainWindow):
 
     def restore_site(self):
         name = self.get_selected(True)
-        if not name: 
+        if not name or self.is_busy(name): 
             return
             
-        new_port = get_next_port(self.meta)
+        port = self.reserve_port()
         self.statusBar().showMessage(f"Restoring {name}...")
-        self.thread = SiteThread(name, BASE_DIR, "restore")
-        self.thread.finished.connect(lambda msg, ok: self.restored_done(name, new_port, msg, ok))
-        self.thread.start()
+        self.submit_job("restore", name, lambda msg, ok: self.restored_done(name, port, msg, ok))
 
     def restored_done(self, name, port, msg, ok):
+        if name not in self.meta:
+            return
         if ok:
-            self.meta[name] = {"port": port, "pid": None, "status": "Stopped", "archived": False}
+            self.meta[name] = {"port": port, "archived": False}
             save_metadata(self.meta)
             clear_port_cache()
             self.load_sites()
@@ -607,22 +1001,14 @@ class FlaskManager(QMainWindow):
 
     def delete_site(self):
         name = self.get_selected(False)
-        if not name: 
+        if not name or self.is_busy(name): 
             return
             
         if QMessageBox.question(self, "Confirm Delete", 
                               f"Permanently delete site '{name}'? This cannot be undone.") == QMessageBox.Yes:
-            # Kill process if running
-            if port_in_use(self.meta[name]["port"]):
-                pid = self.meta[name].get("pid")
-                if pid:
-                    try:
-                        subprocess.run(["taskkill", "/PID", str(pid), "/F"], 
-                                     stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-                    except:
-                        pass
+            self.kill_site(name)
             
-            shutil.rmtree(BASE_DIR / name, ignore_errors=True)
+            fast_rmtree(BASE_DIR / name)
             self.meta.pop(name, None)
             save_metadata(self.meta)
             clear_port_cache()
@@ -631,7 +1017,7 @@ class FlaskManager(QMainWindow):
 
     def delete_archive(self):
         name = self.get_selected(True)
-        if not name: 
+        if not name or self.is_busy(name): 
             return
             
         if QMessageBox.question(self, "Confirm Delete", 